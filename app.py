@@ -1,8 +1,12 @@
+import html
 import json
 import os
+import threading
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import quote
 
 import streamlit as st
 from supabase import create_client, Client  # ← Supabase
@@ -113,7 +117,28 @@ def _sb() -> Client:
 # =========================
 def _empty_data():
     # ahora incluye la lista de usuarios sugeridos
-    return {"tramas": [], "predicciones": [], "usuarios": ["Wellman", "Nico", "Juany"]}
+    return {"tramas": [], "predicciones": [], "usuarios": ["Wellman", "Nico", "Juany"], "stats": {}}
+
+
+def _migrar(data):
+    """Aplica las migraciones pendientes en memoria. Devuelve True si cambió algo."""
+    # Migración: ganador único -> lista; y agregar 'usuarios'
+    changed = False
+    for t in data.get("tramas", []):
+        if "ganadoras_prediccion_ids" not in t:
+            old = t.get("ganadora_prediccion_id")
+            t["ganadoras_prediccion_ids"] = [old] if old else []
+            if "ganadora_prediccion_id" in t:
+                del t["ganadora_prediccion_id"]
+            changed = True
+    if "usuarios" not in data or not isinstance(data["usuarios"], list):
+        data["usuarios"] = ["Wellman", "Nico", "Juany"]
+        changed = True
+    # Migración: agregados por usuario (se reconstruyen desde el historial)
+    if "stats" not in data or not isinstance(data["stats"], dict):
+        reconstruir_stats(data)
+        changed = True
+    return changed
 
 
 def load_data():
@@ -125,21 +150,7 @@ def load_data():
         sb = _sb()
         res = sb.table("store").select("data").eq("id", 1).single().execute()
         data = res.data["data"] if res.data and "data" in res.data else _empty_data()
-
-        # Migración: ganador único -> lista; y agregar 'usuarios'
-        changed = False
-        for t in data.get("tramas", []):
-            if "ganadoras_prediccion_ids" not in t:
-                old = t.get("ganadora_prediccion_id")
-                t["ganadoras_prediccion_ids"] = [old] if old else []
-                if "ganadora_prediccion_id" in t:
-                    del t["ganadora_prediccion_id"]
-                changed = True
-        if "usuarios" not in data or not isinstance(data["usuarios"], list):
-            data["usuarios"] = ["Wellman", "Nico", "Juany"]
-            changed = True
-
-        if changed:
+        if _migrar(data):
             save_data(data)
         return data
     except Exception:
@@ -148,11 +159,18 @@ def load_data():
             save_data(_empty_data())
         try:
             with open(DATA_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+                data = json.load(f)
         except Exception:
             data = _empty_data()
             save_data(data)
             return data
+        # Migrar solo en memoria: no pisar el store remoto con una copia local
+        # vieja; la migración se guarda cuando Supabase vuelva a responder.
+        try:
+            _migrar(data)
+        except Exception:
+            pass
+        return data
 
 
 def save_data(data: dict):
@@ -225,11 +243,183 @@ def compute_leaderboard(data):
     return leaderboard
 
 
+# =========================
+# ESTADÍSTICAS POR USUARIO (agregados incrementales)
+# =========================
+# data["stats"][usuario] se actualiza en cada crear/editar/borrar/cerrar para
+# que el perfil se lea sin recorrer todo el store. reconstruir_stats() los
+# recalcula desde el historial (migración o reparación manual).
+FORMA_MAX = 10
+
+
+def _stats_vacias():
+    return {
+        "predicciones": 0,
+        "editadas": 0,
+        "por_trama": {},  # {trama_id: cantidad de predicciones}
+        "cerradas_jugadas": 0,
+        "tramas_ganadas": 0,
+        "aciertos": 0,
+        "puntos": 0,
+        "ganadas_por_puntos": {"3": 0, "2": 0, "1": 0},
+        "forma": [],  # últimas tramas cerradas jugadas, la más reciente primero
+    }
+
+
+def _stats_de(data, usuario):
+    return data.setdefault("stats", {}).setdefault(usuario, _stats_vacias())
+
+
+def stats_registrar_prediccion(data, pred, signo=1):
+    """Suma (signo=1) o resta (signo=-1) una predicción a los agregados de su autor."""
+    s = _stats_de(data, pred["autor"])
+    s["predicciones"] += signo
+    cant = s["por_trama"].get(pred["trama_id"], 0) + signo
+    if cant > 0:
+        s["por_trama"][pred["trama_id"]] = cant
+    else:
+        s["por_trama"].pop(pred["trama_id"], None)
+    if pred.get("ultima_edicion"):
+        s["editadas"] += signo
+
+
+def stats_registrar_edicion(data, pred):
+    """Llamar antes de marcar `ultima_edicion`: cuenta predicciones editadas al menos una vez."""
+    if not pred.get("ultima_edicion"):
+        _stats_de(data, pred["autor"])["editadas"] += 1
+
+
+def _resultado_en_trama(trama, suyas):
+    """(aciertos, puntos por acierto) de un autor con predicciones `suyas` en una trama cerrada."""
+    ganadoras = set(trama.get("ganadoras_prediccion_ids", []))
+    aciertos = sum(1 for p in suyas if p["id"] in ganadoras)
+    return aciertos, compute_puntos_por_cantidad(len(suyas)) if aciertos else 0
+
+
+def stats_registrar_cierre(data, trama, signo=1):
+    """
+    Aplica (o revierte, con signo=-1) el resultado de una trama cerrada.
+    Al revertir solo se saca la trama de `forma`; para rellenarla con
+    resultados más viejos llamar a stats_refrescar_forma después de borrar.
+    """
+    por_autor = {}
+    for p in list_predicciones_de_trama(data, trama["id"]):
+        por_autor.setdefault(p["autor"], []).append(p)
+    for autor, suyas in por_autor.items():
+        s = _stats_de(data, autor)
+        aciertos, pts = _resultado_en_trama(trama, suyas)
+        s["cerradas_jugadas"] += signo
+        s["aciertos"] += signo * aciertos
+        s["puntos"] += signo * pts * aciertos
+        if aciertos:
+            s["tramas_ganadas"] += signo
+            s["ganadas_por_puntos"][str(pts)] += signo
+        if signo > 0:
+            item = {"trama_id": trama["id"], "gano": bool(aciertos), "pts": pts * aciertos}
+            s["forma"] = ([item] + s["forma"])[:FORMA_MAX]
+        else:
+            s["forma"] = [f for f in s["forma"] if f["trama_id"] != trama["id"]]
+
+
+def stats_refrescar_forma(data, autores):
+    """Rearma `forma` de esos autores desde el historial (p. ej. tras borrar tramas cerradas)."""
+    autores = set(autores)
+    jugadas = {}  # {autor: {trama_id: [predicciones]}}
+    for p in data["predicciones"]:
+        if p["autor"] in autores:
+            jugadas.setdefault(p["autor"], {}).setdefault(p["trama_id"], []).append(p)
+    cerradas = sorted(
+        (t for t in data["tramas"] if not t["abierta"]),
+        key=lambda t: t.get("cerrada") or t["creada"],
+        reverse=True,
+    )
+    for autor in autores:
+        forma = []
+        for t in cerradas:
+            suyas = jugadas.get(autor, {}).get(t["id"])
+            if not suyas:
+                continue
+            aciertos, pts = _resultado_en_trama(t, suyas)
+            forma.append({"trama_id": t["id"], "gano": bool(aciertos), "pts": pts * aciertos})
+            if len(forma) == FORMA_MAX:
+                break
+        _stats_de(data, autor)["forma"] = forma
+
+
+def reconstruir_stats(data):
+    data["stats"] = {}
+    for p in data["predicciones"]:
+        stats_registrar_prediccion(data, p)
+    cerradas = [t for t in data["tramas"] if not t["abierta"]]
+    for t in sorted(cerradas, key=lambda t: t.get("cerrada") or t["creada"]):
+        stats_registrar_cierre(data, t)
+    return data["stats"]
+
+
+# =========================
+# CACHÉ DE FRAGMENTOS (tramas cerradas)
+# =========================
+# Una trama cerrada ya no cambia (no se puede predecir, editar ni borrar
+# predicciones), así que su HTML/markdown se arma una sola vez y se comparte
+# entre sesiones. Solo se invalida cuando se elimina la trama o se renombran
+# sus usuarios.
+FRAGMENTOS_MAX = 256
+
+
+@st.cache_resource
+def _cache_fragmentos():
+    # "gen": {trama_id: cantidad de invalidaciones}
+    return {"lock": threading.Lock(), "items": OrderedDict(), "gen": {}}
+
+
+def marca_fragmentos():
+    """
+    Foto de las generaciones del caché. Tomarla ANTES de load_data() y pasarla
+    a fragmento_trama_cerrada, para no guardar fragmentos armados con datos
+    que otra sesión invalidó mientras tanto.
+    """
+    cache = _cache_fragmentos()
+    with cache["lock"]:
+        return dict(cache["gen"])
+
+
+def fragmento_trama_cerrada(trama_id, tipo, construir, marca):
+    """
+    Devuelve el fragmento (trama_id, tipo) desde el caché LRU, o lo construye
+    con `construir()` y lo guarda. Usar solo con tramas cerradas. Si la trama
+    se invalidó después de `marca`, el fragmento se devuelve sin guardarlo.
+    """
+    cache = _cache_fragmentos()
+    clave = (trama_id, tipo)
+    gen = marca.get(trama_id, 0)
+    with cache["lock"]:
+        if clave in cache["items"] and cache["gen"].get(trama_id, 0) == gen:
+            cache["items"].move_to_end(clave)
+            return cache["items"][clave]
+    valor = construir()
+    with cache["lock"]:
+        if cache["gen"].get(trama_id, 0) != gen:
+            return valor
+        cache["items"][clave] = valor
+        cache["items"].move_to_end(clave)
+        while len(cache["items"]) > FRAGMENTOS_MAX:
+            cache["items"].popitem(last=False)
+    return valor
+
+
+def invalidar_fragmentos_trama(trama_id):
+    cache = _cache_fragmentos()
+    with cache["lock"]:
+        cache["gen"][trama_id] = cache["gen"].get(trama_id, 0) + 1
+        for clave in [k for k in cache["items"] if k[0] == trama_id]:
+            del cache["items"][clave]
+
+
 # =========================
 # ESTADO DE SESIÓN + URL (persistir usuario y vista)
 # =========================
 if "pantalla" not in st.session_state:
-    st.session_state.pantalla = "inicio"  # "inicio" | "crear" | "trama"
+    st.session_state.pantalla = "inicio"  # "inicio" | "crear" | "trama" | "perfil" | "admin"
 if "usuario" not in st.session_state:
     st.session_state.usuario = ""
 if "usuario_locked" not in st.session_state:
@@ -238,6 +428,8 @@ if "trama_seleccionada" not in st.session_state:
     st.session_state.trama_seleccionada = None
 if "editando_pred" not in st.session_state:
     st.session_state.editando_pred = {}  # {pred_id: True/False}
+if "perfil_usuario" not in st.session_state:
+    st.session_state.perfil_usuario = None
 
 # Leer usuario desde query param ?u=...
 qp = st.query_params
@@ -252,10 +444,21 @@ if "view" in qp:
     val = qp["view"]
     _id = (val[0] if isinstance(val, list) else val) or None
 
+# Abrir perfil desde ?perfil=NOMBRE
+_perfil = None
+if "perfil" in qp:
+    val = qp["perfil"]
+    _perfil = (val[0] if isinstance(val, list) else val) or None
+
 if _id:
     st.session_state.pantalla = "trama"
     st.session_state.trama_seleccionada = _id
-    # Limpiar solo 'view' y preservar 'u' para que no se "desloguee"
+elif _perfil:
+    st.session_state.pantalla = "perfil"
+    st.session_state.perfil_usuario = _perfil
+
+if _id or _perfil:
+    # Limpiar 'view'/'perfil' y preservar 'u' para que no se "desloguee"
     try:
         current_u = st.query_params.get("u")
         st.query_params.clear()
@@ -284,6 +487,17 @@ def goto_trama(trama_id):
     st.session_state.trama_seleccionada = trama_id
 
 
+def goto_admin():
+    st.session_state.pantalla = "admin"
+    st.session_state.trama_seleccionada = None
+
+
+def goto_perfil(usuario):
+    st.session_state.pantalla = "perfil"
+    st.session_state.perfil_usuario = usuario
+    st.session_state.trama_seleccionada = None
+
+
 def crear_trama(usuario, pregunta, descripcion):
     data = load_data()
     t = {
@@ -320,6 +534,7 @@ def agregar_prediccion(usuario, trama_id, texto):
         "ultima_edicion": None,
     }
     data["predicciones"].append(p)
+    stats_registrar_prediccion(data, p)
     save_data(data)
     st.success("✅ Predicción agregada.")
 
@@ -331,6 +546,7 @@ def editar_prediccion(pred_id, nuevo_texto, usuario):
     if not pred or pred["autor"] != usuario or not trama or not trama["abierta"]:
         st.error("No se pudo editar (permisos o estado de trama).")
         return
+    stats_registrar_edicion(data, pred)
     pred["texto"] = nuevo_texto.strip()
     pred["ultima_edicion"] = timestamp()
     save_data(data)
@@ -344,19 +560,49 @@ def eliminar_prediccion(pred_id, usuario):
     if not pred or pred["autor"] != usuario or not trama or not trama["abierta"]:
         st.error("No se pudo eliminar (permisos o estado de trama).")
         return
+    stats_registrar_prediccion(data, pred, signo=-1)
     data["predicciones"] = [p for p in data["predicciones"] if p["id"] != pred_id]
     save_data(data)
     st.warning("🗑️ Predicción eliminada.")
 
 
+def _cerrar_trama(data, trama, ganadoras_ids):
+    trama["abierta"] = False
+    trama["ganadoras_prediccion_ids"] = list(ganadoras_ids)
+    trama["cerrada"] = timestamp()
+    stats_registrar_cierre(data, trama)
+
+
+def _quitar_tramas(data, trama_ids):
+    """Borra las tramas y sus predicciones en memoria (una pasada), revirtiendo agregados."""
+    ids = set(trama_ids)
+    cerradas = {t["id"] for t in data["tramas"] if t["id"] in ids and not t["abierta"]}
+    for t in data["tramas"]:
+        if t["id"] in cerradas:
+            stats_registrar_cierre(data, t, signo=-1)
+    quedan = []
+    afectados = set()
+    for p in data["predicciones"]:
+        if p["trama_id"] in ids:
+            stats_registrar_prediccion(data, p, signo=-1)
+            if p["trama_id"] in cerradas:
+                afectados.add(p["autor"])
+        else:
+            quedan.append(p)
+    data["predicciones"] = quedan
+    data["tramas"] = [t for t in data["tramas"] if t["id"] not in ids]
+    # Rellenar la forma reciente con resultados anteriores a las tramas borradas
+    if afectados:
+        stats_refrescar_forma(data, afectados)
+
+
 def cerrar_trama_con_ganadores(trama_id, ganadoras_ids, usuario):
     data = load_data()
     trama = get_trama(data, trama_id)
     if not trama or trama["creador"] != usuario or not trama["abierta"]:
         st.error("No podés cerrar esta trama.")
         return
-    trama["abierta"] = False
-    trama["ganadoras_prediccion_ids"] = list(ganadoras_ids)
+    _cerrar_trama(data, trama, ganadoras_ids)
     save_data(data)
     st.success("🏁 Trama cerrada con ganador(es).")
 
@@ -367,8 +613,7 @@ def cerrar_trama_desierta(trama_id, usuario):
     if not trama or trama["creador"] != usuario or not trama["abierta"]:
         st.error("No podés cerrar esta trama.")
         return
-    trama["abierta"] = False
-    trama["ganadoras_prediccion_ids"] = []
+    _cerrar_trama(data, trama, [])
     save_data(data)
     st.warning("🚫 Trama cerrada como desierta (sin puntos).")
 
@@ -379,11 +624,9 @@ def eliminar_trama(trama_id, usuario):
     if not trama or trama["creador"] != usuario:
         st.error("No podés eliminar esta trama.")
         return
-    # Borrar predicciones asociadas
-    data["predicciones"] = [p for p in data["predicciones"] if p["trama_id"] != trama_id]
-    # Borrar trama
-    data["tramas"] = [t for t in data["tramas"] if t["id"] != trama_id]
+    _quitar_tramas(data, [trama_id])
     save_data(data)
+    invalidar_fragmentos_trama(trama_id)
     st.success("🧨 Trama eliminada.")
     goto_inicio()
 
@@ -409,14 +652,122 @@ def agregar_usuario(nombre: str):
 
 
 def eliminar_usuario_de_lista(nombre: str):
+    eliminar_usuarios_de_lista([nombre])
+
+
+# =========================
+# ACCIONES EN LOTE (un load + un save por operación)
+# =========================
+# Cada lote valida todo antes de tocar nada: si un ítem no se puede procesar
+# no se guarda ningún cambio.
+def cerrar_tramas_en_lote(trama_ids, usuario):
+    data = load_data()
+    tramas = [get_trama(data, tid) for tid in trama_ids]
+    if not tramas or any(not t or t["creador"] != usuario or not t["abierta"] for t in tramas):
+        st.error("No se cerró nada: alguna trama no existe, no es tuya o ya estaba cerrada.")
+        return
+    for t in tramas:
+        _cerrar_trama(data, t, [])
+    save_data(data)
+    st.toast(f"🚫 {len(tramas)} trama(s) cerradas como desiertas")
+
+
+def eliminar_tramas_en_lote(trama_ids, usuario):
+    data = load_data()
+    tramas = [get_trama(data, tid) for tid in trama_ids]
+    if not tramas or any(not t or t["creador"] != usuario for t in tramas):
+        st.error("No se eliminó nada: alguna trama no existe o no es tuya.")
+        return
+    _quitar_tramas(data, trama_ids)
+    save_data(data)
+    for tid in trama_ids:
+        invalidar_fragmentos_trama(tid)
+    st.toast(f"🧨 {len(tramas)} trama(s) eliminadas")
+
+
+def conflictos_fusion(data, origenes, destino):
+    """
+    Tramas donde fusionar `origenes` en `destino` junta predicciones de más de
+    un usuario: (excedidas, cerradas). `excedidas` superarían el máximo de 3
+    predicciones por trama; `cerradas` son tramas cerradas cuyo puntaje cambiaría.
+    """
+    fusion = set(origenes) | {destino}
+    por_trama = {}  # {trama_id: {autor: cantidad}}
+    for p in data["predicciones"]:
+        if p["autor"] in fusion:
+            autores = por_trama.setdefault(p["trama_id"], {})
+            autores[p["autor"]] = autores.get(p["autor"], 0) + 1
+    excedidas, cerradas = [], []
+    for trama_id, autores in por_trama.items():
+        if len(autores) < 2:
+            continue
+        trama = get_trama(data, trama_id)
+        if sum(autores.values()) > 3:
+            excedidas.append(trama)
+        elif trama and not trama["abierta"]:
+            cerradas.append(trama)
+    return excedidas, cerradas
+
+
+def renombrar_usuarios(origenes, destino: str):
+    """
+    Renombra (o fusiona, si son varios o el destino ya existe) usuarios en
+    todas sus predicciones y tramas creadas, y en la lista de usuarios.
+    """
+    destino = destino.strip()
+    origenes = [o for o in origenes if o != destino]
+    if not destino or not origenes:
+        st.warning("Elegí al menos un usuario de origen y un nombre de destino distinto.")
+        return
+    data = load_data()
+    excedidas, _ = conflictos_fusion(data, origenes, destino)
+    if excedidas:
+        st.error(
+            f"No se fusionó nada: en {len(excedidas)} trama(s) “{destino}” quedaría con más de 3 predicciones."
+        )
+        return
+    origenes_set = set(origenes)
+    tocadas = set()
+    for p in data["predicciones"]:
+        if p["autor"] in origenes_set:
+            p["autor"] = destino
+            tocadas.add(p["trama_id"])
+    for t in data["tramas"]:
+        if t["creador"] in origenes_set:
+            t["creador"] = destino
+            tocadas.add(t["id"])
+    usuarios = [u for u in data.get("usuarios", []) if u not in origenes_set]
+    if destino not in usuarios:
+        usuarios.append(destino)
+    data["usuarios"] = usuarios
+    # Los puntos dependen de cuántas predicciones tiene cada autor por trama
+    reconstruir_stats(data)
+    save_data(data)
+    for tid in tocadas:
+        invalidar_fragmentos_trama(tid)
+    if st.session_state.usuario in origenes_set:
+        st.session_state.usuario = destino
+        try:
+            st.query_params.update({"u": destino})
+        except Exception:
+            pass
+    st.toast(f"👥 {len(origenes)} usuario(s) pasados a “{destino}”")
+
+
+def eliminar_usuarios_de_lista(nombres):
     data = load_data()
     if "usuarios" not in data or not isinstance(data["usuarios"], list):
         data["usuarios"] = []
-    if nombre in data["usuarios"]:
-        data["usuarios"].remove(nombre)
+    quitar = set(nombres)
+    antes = len(data["usuarios"])
+    data["usuarios"] = [u for u in data["usuarios"] if u not in quitar]
+    if len(data["usuarios"]) != antes:
         save_data(data)
-        st.toast(f"🗑️ Usuario “{nombre}” eliminado de la lista")
-    if st.session_state.usuario == nombre:
+        if len(quitar) == 1:
+            st.toast(f"🗑️ Usuario “{nombres[0]}” eliminado de la lista")
+        else:
+            st.toast(f"🗑️ {antes - len(data['usuarios'])} usuario(s) eliminados de la lista")
+    if st.session_state.usuario in quitar:
         st.session_state.usuario = ""
         try:
             # limpiamos 'u' en la URL
@@ -441,6 +792,13 @@ with st.sidebar:
     with st.container():
         st.markdown("<div class='sidebar-linklike'>", unsafe_allow_html=True)
         st.button("Volver al inicio", on_click=goto_inicio)
+        st.button("Administración", on_click=goto_admin)
+        st.button(
+            "Mi perfil",
+            on_click=goto_perfil,
+            args=(st.session_state.usuario,),
+            disabled=not st.session_state.usuario,
+        )
         st.markdown("</div>", unsafe_allow_html=True)
 
     data_for_sidebar = load_data()
@@ -505,21 +863,34 @@ def bloque_tabla_posiciones():
         st.caption("Sin puntos todavía. ¡Cerrá una trama con ganador!")
     else:
         for pos, (user, pts) in enumerate(lb, start=1):
-            st.write(f"**{pos}. {user}** — {pts} pts")
+            # Link al perfil en la MISMA pestaña, igual que las cartas de trama
+            st.markdown(
+                f"<a href=\"?perfil={quote(user)}&u={quote(st.session_state.usuario)}\" target=\"_self\" "
+                f"style=\"color:inherit; text-decoration:none\" title=\"Ver perfil\">"
+                f"<strong>{pos}. {html.escape(user)}</strong></a> — {pts} pts",
+                unsafe_allow_html=True,
+            )
 
 
 # =========================
 # UI AUX: CARTA CLICKEABLE
 # =========================
-def trama_link_card(trama, total_preds):
+def _trama_card_inner(trama, total_preds):
     pill_html = f"<span class='pill {'pill-open' if trama['abierta'] else 'pill-closed'}'>" \
                 f"{'Abierta' if trama['abierta'] else 'Cerrada'}</span>"
-    inner = (
+    return (
         f"{pill_html}"
         f"<div style='height:6px'></div>"
         f"<div style='font-weight:700; font-size:1.05rem; color:#222'>{trama['pregunta']}</div>"
         f"<div class='meta'>por {trama['creador']} • {trama['creada']} • {total_preds} predicciones</div>"
     )
+
+
+def trama_link_card(data, trama, marca):
+    def construir():
+        return _trama_card_inner(trama, len(list_predicciones_de_trama(data, trama["id"])))
+
+    inner = construir() if trama["abierta"] else fragmento_trama_cerrada(trama["id"], "card", construir, marca)
     css_class = "trama-card open" if trama["abierta"] else "trama-card closed"
     # Abrir en la MISMA pestaña (no usamos target=_blank)
     st.markdown(
@@ -530,6 +901,41 @@ def trama_link_card(trama, total_preds):
     )
 
 
+# =========================
+# UI AUX: PREDICCIONES Y GANADORES
+# =========================
+def _pred_card_body(p):
+    return (
+        f"<strong>{p['autor']}</strong> — <span style='color:#777'>{p['creada']}</span><br>"
+        f"{p['texto']}"
+        + (f"<br><span style='color:#999; font-size:0.85rem'>Editado: {p['ultima_edicion']}</span>" if p['ultima_edicion'] else "")
+    )
+
+
+def _predicciones_ordenadas(data, trama, marca):
+    """Lista [(pred, html)] de la trama, más nuevas primero (cacheada si está cerrada)."""
+    def construir():
+        preds = list_predicciones_de_trama(data, trama["id"])
+        return [(p, _pred_card_body(p)) for p in sorted(preds, key=lambda x: x["creada"], reverse=True)]
+
+    if trama["abierta"]:
+        return construir()
+    return fragmento_trama_cerrada(trama["id"], "preds", construir, marca)
+
+
+def _ganadores_markdown(data, trama):
+    ganadoras = []
+    for pid in trama.get("ganadoras_prediccion_ids", []):
+        pred = next((p for p in data["predicciones"] if p["id"] == pid), None)
+        if pred:
+            cant = len(list_predicciones_de_trama_por_usuario(data, trama["id"], pred["autor"]))
+            pts = compute_puntos_por_cantidad(cant)
+            ganadoras.append(f"**{pred['autor']}** con “{pred['texto']}” → **+{pts} pts**")
+    if not ganadoras:
+        return ""
+    return "Ganadores:\n\n- " + "\n- ".join(ganadoras)
+
+
 # =========================
 # PANTALLAS
 # =========================
@@ -540,6 +946,7 @@ def pantalla_inicio():
     with col_left:
         st.button("➕ Crear trama", type="primary", on_click=goto_crear)
 
+        marca = marca_fragmentos()
         data = load_data()
         abiertas = [t for t in data["tramas"] if t["abierta"]]
         cerradas = [t for t in data["tramas"] if not t["abierta"]]
@@ -549,8 +956,7 @@ def pantalla_inicio():
             st.caption("No hay tramas abiertas por ahora.")
         else:
             for t in abiertas:
-                preds = list_predicciones_de_trama(data, t["id"])
-                trama_link_card(t, len(preds))
+                trama_link_card(data, t, marca)
 
         st.markdown("---")
         st.markdown("### 🔒 Tramas cerradas")
@@ -558,8 +964,7 @@ def pantalla_inicio():
             st.caption("Aún no hay tramas cerradas.")
         else:
             for t in cerradas:
-                preds = list_predicciones_de_trama(data, t["id"])
-                trama_link_card(t, len(preds))
+                trama_link_card(data, t, marca)
 
     with col_right:
         bloque_tabla_posiciones()
@@ -595,6 +1000,7 @@ def pantalla_crear():
 def pantalla_trama():
     cabecera()
 
+    marca = marca_fragmentos()
     data = load_data()
     trama = get_trama(data, st.session_state.trama_seleccionada)
     if not trama:
@@ -616,10 +1022,11 @@ def pantalla_trama():
 
     with col_left:
         st.subheader("🗳️ Predicciones")
-        preds = list_predicciones_de_trama(data, trama["id"])
+        preds_ordenadas = _predicciones_ordenadas(data, trama, marca)
+        preds = [p for p, _ in preds_ordenadas]
         mis_preds = list_predicciones_de_trama_por_usuario(
             data, trama["id"], st.session_state.usuario.strip()
-        ) if st.session_state.usuario.strip() else []
+        ) if trama["abierta"] and st.session_state.usuario.strip() else []
 
         # Agregar predicción
         if trama["abierta"]:
@@ -643,15 +1050,11 @@ def pantalla_trama():
         if not preds:
             st.caption("Aún no hay predicciones.")
         else:
-            for p in sorted(preds, key=lambda x: x["creada"], reverse=True):
+            for p, cuerpo in preds_ordenadas:
                 is_me = st.session_state.usuario.strip() and (p["autor"] == st.session_state.usuario.strip())
                 with st.container():
                     st.markdown(
-                        f"<div class='pred-card {'me' if is_me else ''}'>"
-                        f"<strong>{p['autor']}</strong> — <span style='color:#777'>{p['creada']}</span><br>"
-                        f"{p['texto']}"
-                        + (f"<br><span style='color:#999; font-size:0.85rem'>Editado: {p['ultima_edicion']}</span>" if p['ultima_edicion'] else "")
-                        + "</div>",
+                        f"<div class='pred-card {'me' if is_me else ''}'>{cuerpo}</div>",
                         unsafe_allow_html=True,
                     )
                     # Controles de edición con modo explícito
@@ -714,15 +1117,11 @@ def pantalla_trama():
             else:
                 st.subheader("✅ Trama cerrada")
                 if trama.get("ganadoras_prediccion_ids"):
-                    ganadoras = []
-                    for pid in trama["ganadoras_prediccion_ids"]:
-                        pred = next((p for p in data["predicciones"] if p["id"] == pid), None)
-                        if pred:
-                            cant = len(list_predicciones_de_trama_por_usuario(data, trama["id"], pred["autor"]))
-                            pts = compute_puntos_por_cantidad(cant)
-                            ganadoras.append(f"**{pred['autor']}** con “{pred['texto']}” → **+{pts} pts**")
-                    if ganadoras:
-                        st.success("Ganadores:\n\n- " + "\n- ".join(ganadoras))
+                    ganadores_md = fragmento_trama_cerrada(
+                        trama["id"], "ganadores", lambda: _ganadores_markdown(data, trama), marca
+                    )
+                    if ganadores_md:
+                        st.success(ganadores_md)
                 else:
                     st.warning("Cerrada como desierta (no se asignaron puntos).")
 
@@ -730,6 +1129,150 @@ def pantalla_trama():
         bloque_tabla_posiciones()
 
 
+def pantalla_perfil():
+    cabecera()
+
+    usuario = st.session_state.perfil_usuario
+    st.button("⬅️ Volver", on_click=goto_inicio)
+    if not usuario:
+        st.error("No se eligió ningún usuario.")
+        return
+
+    st.subheader(f"👤 {usuario}")
+    data = load_data()
+    s = data.get("stats", {}).get(usuario)
+    if not s or not s["predicciones"] and not s["cerradas_jugadas"]:
+        st.caption("Todavía no tiene predicciones.")
+    else:
+        jugadas = len(s["por_trama"])
+        tasa = s["tramas_ganadas"] / s["cerradas_jugadas"] if s["cerradas_jugadas"] else 0
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Puntos", s["puntos"])
+        c2.metric("Tasa de acierto", f"{tasa:.0%}", help="Tramas cerradas ganadas / tramas cerradas jugadas")
+        c3.metric("Predicciones por trama", f"{s['predicciones'] / jugadas:.1f}" if jugadas else "—")
+        c4.metric("Tramas jugadas", jugadas)
+
+        st.markdown("### 🥇 Tramas ganadas por puntos")
+        g = s["ganadas_por_puntos"]
+        c1, c2, c3 = st.columns(3)
+        c1.metric("+3 (una predicción)", g["3"])
+        c2.metric("+2 (dos predicciones)", g["2"])
+        c3.metric("+1 (tres predicciones)", g["1"])
+
+        st.markdown("### 📈 Forma reciente")
+        if not s["forma"]:
+            st.caption("Aún no jugó tramas cerradas.")
+        else:
+            st.markdown(" ".join("✅" if f["gano"] else "❌" for f in s["forma"]))
+            st.caption(
+                f"Últimas {len(s['forma'])} tramas cerradas (la más reciente primero) • "
+                f"{s['aciertos']} predicciones acertadas • {s['editadas']} editadas"
+            )
+
+    st.markdown("---")
+    if st.button("Recalcular estadísticas desde el historial"):
+        data = load_data()
+        reconstruir_stats(data)
+        save_data(data)
+        st.toast("🔁 Estadísticas recalculadas")
+        st.rerun()
+
+
+def _accion_confirmada(clave_confirmacion, accion, *args):
+    """Callback: corre la acción en lote y desmarca su checkbox de confirmación."""
+    accion(*args)
+    st.session_state[clave_confirmacion] = False
+
+
+def pantalla_admin():
+    cabecera()
+    st.button("⬅️ Volver", on_click=goto_inicio)
+
+    usuario = st.session_state.usuario.strip()
+    if not usuario:
+        st.error("Elegí tu usuario a la izquierda.")
+        return
+
+    data = load_data()
+    mias = [t for t in data["tramas"] if t["creador"] == usuario]
+    etiquetas = {t["id"]: f"{t['pregunta']} — {t['creada']}" for t in mias}
+
+    col_left, col_right = st.columns(2, gap="large")
+
+    with col_left:
+        st.subheader("🏁 Cerrar tramas")
+        abiertas = [t["id"] for t in mias if t["abierta"]]
+        if not abiertas:
+            st.caption("No tenés tramas abiertas.")
+        else:
+            sel_cerrar = st.multiselect(
+                "Tramas a cerrar como desiertas", options=abiertas, format_func=etiquetas.get
+            )
+            if st.button("Cerrar seleccionadas", type="primary", disabled=not sel_cerrar):
+                cerrar_tramas_en_lote(sel_cerrar, usuario)
+                st.rerun()
+
+        st.markdown("---")
+        st.subheader("🧨 Eliminar tramas")
+        if not mias:
+            st.caption("No creaste tramas.")
+        else:
+            sel_borrar = st.multiselect(
+                "Tramas a eliminar (con sus predicciones)", options=list(etiquetas), format_func=etiquetas.get
+            )
+            conf = st.checkbox(
+                "Estoy seguro, quiero eliminar estas tramas y sus predicciones.", key="conf_borrar_lote"
+            )
+            st.button(
+                "Eliminar seleccionadas",
+                disabled=not (sel_borrar and conf),
+                on_click=_accion_confirmada,
+                args=("conf_borrar_lote", eliminar_tramas_en_lote, sel_borrar, usuario),
+            )
+
+    with col_right:
+        st.subheader("👥 Renombrar / fusionar usuarios")
+        conocidos = sorted(
+            set(data.get("usuarios", []))
+            | {p["autor"] for p in data["predicciones"]}
+            | {t["creador"] for t in data["tramas"]},
+            key=str.lower,
+        )
+        origenes = st.multiselect("Usuarios de origen", options=conocidos)
+        destino = st.text_input("Nuevo nombre (o usuario existente para fusionar)")
+        bloqueada = False
+        if origenes and destino.strip():
+            excedidas, cerradas = conflictos_fusion(data, origenes, destino.strip())
+            if excedidas:
+                bloqueada = True
+                st.error(
+                    "No se puede fusionar: quedarían más de 3 predicciones en:\n\n- "
+                    + "\n- ".join(t["pregunta"] if t else "(trama borrada)" for t in excedidas)
+                )
+            elif cerradas:
+                st.warning(
+                    "Cambian los puntos ya asignados en estas tramas cerradas:\n\n- "
+                    + "\n- ".join(t["pregunta"] for t in cerradas)
+                )
+        conf_fusion = st.checkbox(
+            "Estoy seguro, quiero reescribir todas sus predicciones y tramas.", key="conf_fusion"
+        )
+        st.button(
+            "Renombrar / fusionar",
+            disabled=bloqueada or not (origenes and destino.strip() and conf_fusion),
+            on_click=_accion_confirmada,
+            args=("conf_fusion", renombrar_usuarios, origenes, destino),
+        )
+
+        st.markdown("---")
+        st.subheader("🗑️ Limpiar lista de usuarios")
+        st.caption("Solo los quita del selector; sus predicciones se mantienen.")
+        quitar = st.multiselect("Usuarios a quitar de la lista", options=data.get("usuarios", []))
+        if st.button("Quitar seleccionados", disabled=not quitar):
+            eliminar_usuarios_de_lista(quitar)
+            st.rerun()
+
+
 # =========================
 # ROUTER
 # =========================
@@ -737,5 +1280,9 @@ if st.session_state.pantalla == "inicio":
     pantalla_inicio()
 elif st.session_state.pantalla == "crear":
     pantalla_crear()
+elif st.session_state.pantalla == "perfil":
+    pantalla_perfil()
+elif st.session_state.pantalla == "admin":
+    pantalla_admin()
 else:
     pantalla_trama()
@@ -0,0 +1,470 @@
+"""
+Prueba de carga de Adivinatobi.
+
+Levanta un "Supabase" local (un PostgREST mínimo que solo entiende la tabla
+`store`, con latencia configurable) y ejecuta N sesiones simuladas de la app
+en paralelo con `streamlit.testing.v1.AppTest`, mezclando vistas y mutaciones.
+Cada sesión corre en su propio proceso: AppTest usa estado global de
+Streamlit (el Runtime) y no se puede correr en varios hilos a la vez.
+
+Reporta:
+  - throughput (acciones/s) y latencias p50/p99 por tipo de acción
+  - round trips al backend por acción, medidos por sesión (cada sesión usa
+    una anon key propia y el stand-in cuenta los requests por key)
+  - updates perdidos: mutaciones que llegaron a escribirse en el store y que
+    no están en el estado final. Las que la app rechazó o nunca guardó se
+    cuentan aparte como "no confirmadas".
+  - errores de la app (excepciones en el script) y del harness (sesiones caídas)
+
+Uso:
+    python loadtest.py --sesiones 30 --acciones 20 --latencia-ms 40
+    python loadtest.py --json > resultado.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import traceback
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+APP_FILE = Path(__file__).resolve().parent / "app.py"
+# Formato JWT (header.payload.firma); la "firma" identifica a la sesión
+FAKE_ANON_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoiYW5vbiJ9.sesion{idx}"
+CONTROL = "/_carga"  # endpoints del harness: no cuentan como round trips ni tienen latencia
+
+# Mezcla por defecto de acciones (pesos relativos)
+MEZCLA = {
+    "ver_inicio": 45,
+    "ver_trama": 30,
+    "agregar_prediccion": 20,
+    "crear_trama": 5,
+}
+
+
+# =========================
+# SUPABASE LOCAL (stand-in)
+# =========================
+class StandIn:
+    """Estado del backend falso: una sola fila `store` y contadores de requests."""
+
+    def __init__(self, data, latencia_ms=0.0, jitter_ms=0.0):
+        self.data = data
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.requests = {}  # {anon key: cantidad}
+        self.escrituras = 0
+        # Todo lo que alguna vez quedó escrito en el store (para confirmar mutaciones)
+        self.textos_escritos = set()
+        self.preguntas_escritas = set()
+        self.lock = threading.Lock()
+
+    def esperar(self):
+        demora = self.latencia_ms + random.uniform(0, self.jitter_ms)
+        if demora > 0:
+            time.sleep(demora / 1000.0)
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.data))
+
+    def contador(self, key=None):
+        with self.lock:
+            if key is None:
+                return sum(self.requests.values())
+            return self.requests.get(key, 0)
+
+    def escribir(self, data):
+        with self.lock:
+            self.data = data
+            self.escrituras += 1
+            self.textos_escritos.update(p.get("texto") for p in data.get("predicciones", []))
+            self.preguntas_escritas.update(t.get("pregunta") for t in data.get("tramas", []))
+
+
+def _handler_para(stand_in):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _responder(self, status, body):
+            payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _ruta(self):
+            return self.path.split("?", 1)[0].rstrip("/")
+
+        def _es_store(self):
+            return self._ruta().endswith("/rest/v1/store")
+
+        def _contar(self):
+            key = self.headers.get("apikey", "")
+            with stand_in.lock:
+                stand_in.requests[key] = stand_in.requests.get(key, 0) + 1
+            stand_in.esperar()
+
+        def _control(self):
+            ruta = self._ruta()
+            if ruta == f"{CONTROL}/store":
+                return self._responder(200, stand_in.snapshot())
+            if ruta.startswith(f"{CONTROL}/contador/"):
+                key = ruta[len(f"{CONTROL}/contador/"):]
+                return self._responder(200, {"requests": stand_in.contador(key)})
+            return self._responder(404, {"message": "not found"})
+
+        def do_GET(self):
+            if self.path.startswith(CONTROL):
+                return self._control()
+            self._contar()
+            if not self._es_store():
+                return self._responder(404, {"message": "not found"})
+            row = {"data": stand_in.snapshot()}
+            if "vnd.pgrst.object" in self.headers.get("Accept", ""):
+                return self._responder(200, row)
+            return self._responder(200, [row])
+
+        def do_POST(self):
+            self._contar()
+            if not self._es_store():
+                return self._responder(404, {"message": "not found"})
+            largo = int(self.headers.get("Content-Length", 0) or 0)
+            body = json.loads(self.rfile.read(largo) or b"{}")
+            rows = body if isinstance(body, list) else [body]
+            for row in rows:
+                if row.get("id") == 1 and "data" in row:
+                    stand_in.escribir(row["data"])
+            return self._responder(201, rows)
+
+        def do_PATCH(self):
+            self._contar()
+            self._responder(405, {"message": "no soportado por el stand-in"})
+
+        do_DELETE = do_PATCH
+
+    return Handler
+
+
+def datos_iniciales(n_tramas, rng):
+    """Store sembrado con tramas abiertas y cerradas (con ganadores)."""
+    data = {"tramas": [], "predicciones": [], "usuarios": ["Wellman", "Nico", "Juany"]}
+    for i in range(n_tramas):
+        t = {
+            "id": str(uuid.uuid4()),
+            "pregunta": f"¿Trama semilla {i}?",
+            "descripcion": "",
+            "creador": rng.choice(data["usuarios"]),
+            "abierta": i % 2 == 0,
+            "ganadoras_prediccion_ids": [],
+            "creada": f"2024-01-01 00:{i // 60:02d}:{i % 60:02d}",
+        }
+        data["tramas"].append(t)
+        for j, autor in enumerate(data["usuarios"]):
+            p = {
+                "id": str(uuid.uuid4()),
+                "trama_id": t["id"],
+                "autor": autor,
+                "texto": f"Predicción semilla {i}.{j}",
+                "creada": t["creada"],
+                "ultima_edicion": None,
+            }
+            data["predicciones"].append(p)
+        if not t["abierta"]:
+            t["ganadoras_prediccion_ids"] = [data["predicciones"][-1]["id"]]
+    return data
+
+
+# =========================
+# SESIÓN SIMULADA (AppTest, un proceso por sesión)
+# =========================
+def _control_get(url, ruta):
+    with urllib.request.urlopen(f"{url}{CONTROL}/{ruta}") as r:
+        return json.load(r)
+
+
+class Sesion:
+    def __init__(self, idx, url, rng, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.usuario = f"carga{idx:03d}"
+        self.key = FAKE_ANON_KEY.format(idx=idx)
+        self.url = url
+        self.rng = rng
+        self.at = AppTest.from_file(str(APP_FILE), default_timeout=timeout)
+        self.at.secrets["SUPABASE_URL"] = url
+        self.at.secrets["SUPABASE_ANON_KEY"] = self.key
+        self.at.query_params["u"] = self.usuario
+        self.intentadas = []  # (tipo, marcador) de mutaciones enviadas
+        self.errores_app = 0
+
+    def _widget(self, coleccion, label):
+        for w in coleccion:
+            if w.label == label:
+                return w
+        return None
+
+    def _run(self):
+        self.at.run()
+        if self.at.exception:
+            self.errores_app += 1
+
+    def _tramas(self, abiertas=None):
+        tramas = _control_get(self.url, "store")["tramas"]
+        if abiertas is None:
+            return tramas
+        return [t for t in tramas if t["abierta"] == abiertas]
+
+    def round_trips(self):
+        return _control_get(self.url, f"contador/{self.key}")["requests"]
+
+    def arrancar(self):
+        self._run()
+
+    def ver_inicio(self):
+        self.at.session_state["pantalla"] = "inicio"
+        self.at.session_state["trama_seleccionada"] = None
+        self._run()
+        return True
+
+    def ver_trama(self, trama_id=None):
+        if trama_id is None:
+            tramas = self._tramas()
+            if not tramas:
+                return False
+            trama_id = self.rng.choice(tramas)["id"]
+        self.at.session_state["pantalla"] = "trama"
+        self.at.session_state["trama_seleccionada"] = trama_id
+        self._run()
+        return True
+
+    def agregar_prediccion(self):
+        abiertas = self._tramas(abiertas=True)
+        if not abiertas:
+            return False
+        trama_id = self.rng.choice(abiertas)["id"]
+        self.ver_trama(trama_id)
+        campo = self._widget(self.at.text_input, "Tu predicción")
+        boton = self._widget(self.at.button, "Agregar predicción")
+        if campo is None or boton is None:
+            return False  # ya hizo 3 predicciones o la trama se cerró
+        texto = f"{self.usuario} predice {uuid.uuid4().hex[:10]}"
+        campo.input(texto)
+        boton.click()
+        self.intentadas.append(("prediccion", texto))
+        self._run()
+        return True
+
+    def crear_trama(self):
+        self.at.session_state["pantalla"] = "crear"
+        self._run()
+        campo = self._widget(self.at.text_input, "Pregunta de la trama")
+        boton = self._widget(self.at.button, "Crear")
+        if campo is None or boton is None:
+            return False
+        pregunta = f"¿{self.usuario} carga {uuid.uuid4().hex[:10]}?"
+        campo.input(pregunta)
+        boton.click()
+        self.intentadas.append(("trama", pregunta))
+        self._run()
+        return True
+
+    def ejecutar(self, tipo):
+        return getattr(self, tipo)()
+
+
+def _proceso_sesion(idx, url, args, workdir, barrera, resultados):
+    """Punto de entrada de cada proceso: arranca la sesión, espera a las demás y corre sus acciones."""
+    res = {
+        "tiempos": {tipo: [] for tipo in MEZCLA},  # [(segundos, round trips)]
+        "omitidas": {tipo: 0 for tipo in MEZCLA},
+        "intentadas": [],
+        "errores_app": 0,
+        "error_harness": None,
+    }
+    sesion = None
+    try:
+        os.chdir(workdir)
+        rng = random.Random(args.semilla + idx)
+        sesion = Sesion(idx, url, rng, args.timeout)
+        sesion.arrancar()
+    except Exception:
+        res["error_harness"] = traceback.format_exc()
+    try:
+        barrera.wait()
+    except Exception:
+        pass
+    if res["error_harness"] is None:
+        tipos, pesos = zip(*MEZCLA.items())
+        try:
+            for tipo in rng.choices(tipos, weights=pesos, k=args.acciones):
+                rt0 = sesion.round_trips()
+                t0 = time.perf_counter()
+                hecha = sesion.ejecutar(tipo)
+                dt = time.perf_counter() - t0
+                if hecha:
+                    res["tiempos"][tipo].append((dt, sesion.round_trips() - rt0))
+                else:
+                    res["omitidas"][tipo] += 1
+        except Exception:
+            res["error_harness"] = traceback.format_exc()
+    if sesion is not None:
+        res["intentadas"] = sesion.intentadas
+        res["errores_app"] = sesion.errores_app
+    resultados.put(res)
+
+
+# =========================
+# MEDICIÓN
+# =========================
+def percentil(valores, q):
+    if not valores:
+        return 0.0
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method="inclusive")[q - 1]
+
+
+def correr_carga(url, args, workdir):
+    ctx = multiprocessing.get_context("spawn")
+    barrera = ctx.Barrier(args.sesiones + 1)
+    resultados = ctx.Queue()
+    procesos = [
+        ctx.Process(target=_proceso_sesion, args=(i, url, args, workdir, barrera, resultados))
+        for i in range(args.sesiones)
+    ]
+    for p in procesos:
+        p.start()
+    # Todas las sesiones arrancan juntas (ya con streamlit importado)
+    try:
+        barrera.wait(timeout=args.timeout * 2)
+    except threading.BrokenBarrierError:
+        pass
+    t0 = time.perf_counter()
+    salidas = []
+    while len(salidas) < len(procesos):
+        try:
+            salidas.append(resultados.get(timeout=1.0))
+        except queue.Empty:
+            if not any(p.is_alive() for p in procesos) and resultados.empty():
+                break  # algún proceso murió sin reportar
+    duracion = time.perf_counter() - t0
+    muertas = len(procesos) - len(salidas)
+    for p in procesos:
+        p.join()
+    return salidas, muertas, duracion
+
+
+def clasificar_mutaciones(salidas, stand_in, final):
+    """(confirmadas, perdidas, no_confirmadas) según lo que realmente pasó por el store."""
+    textos = {p["texto"] for p in final["predicciones"]}
+    preguntas = {t["pregunta"] for t in final["tramas"]}
+    confirmadas = perdidas = no_confirmadas = 0
+    for salida in salidas:
+        for tipo, valor in salida["intentadas"]:
+            escritos, finales = (
+                (stand_in.textos_escritos, textos) if tipo == "prediccion" else (stand_in.preguntas_escritas, preguntas)
+            )
+            if valor not in escritos:
+                no_confirmadas += 1
+                continue
+            confirmadas += 1
+            if valor not in finales:
+                perdidas += 1
+    return confirmadas, perdidas, no_confirmadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de Adivinatobi contra un Supabase local.")
+    parser.add_argument("--sesiones", type=int, default=20, help="sesiones simultáneas (un proceso cada una)")
+    parser.add_argument("--acciones", type=int, default=15, help="acciones por sesión")
+    parser.add_argument("--latencia-ms", type=float, default=30.0, help="latencia fija por request al backend")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="latencia extra aleatoria (0..jitter)")
+    parser.add_argument("--tramas-iniciales", type=int, default=12, help="tramas sembradas en el store")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--timeout", type=float, default=60.0, help="timeout por rerun de AppTest (s)")
+    parser.add_argument("--json", action="store_true", help="imprimir el reporte como JSON")
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    stand_in = StandIn(datos_iniciales(args.tramas_iniciales, rng), args.latencia_ms, args.jitter_ms)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler_para(stand_in))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # La app escribe su respaldo local en el cwd: que no ensucie el repo
+    workdir = tempfile.mkdtemp(prefix="adivinatobi-carga-")
+    try:
+        salidas, muertas, duracion = correr_carga(url, args, workdir)
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    confirmadas, perdidas, no_confirmadas = clasificar_mutaciones(salidas, stand_in, stand_in.snapshot())
+    tiempos = {tipo: [] for tipo in MEZCLA}
+    omitidas = {tipo: 0 for tipo in MEZCLA}
+    for salida in salidas:
+        for tipo in MEZCLA:
+            tiempos[tipo].extend(salida["tiempos"][tipo])
+            omitidas[tipo] += salida["omitidas"][tipo]
+    total = sum(len(v) for v in tiempos.values())
+    round_trips = sum(rt for v in tiempos.values() for _, rt in v)
+    caidas = [s["error_harness"] for s in salidas if s["error_harness"]]
+    reporte = {
+        "sesiones": args.sesiones,
+        "acciones": total,
+        "duracion_s": round(duracion, 3),
+        "throughput_acciones_s": round(total / duracion, 2) if duracion else 0.0,
+        "round_trips_por_accion": round(round_trips / total, 2) if total else 0.0,
+        "mutaciones_confirmadas": confirmadas,
+        "updates_perdidos": perdidas,
+        "mutaciones_no_confirmadas": no_confirmadas,
+        "errores_app": sum(s["errores_app"] for s in salidas),
+        "sesiones_caidas": len(caidas) + muertas,
+        "por_accion": {
+            tipo: {
+                "n": len(tiempos[tipo]),
+                "omitidas": omitidas[tipo],
+                "p50_ms": round(percentil([dt for dt, _ in tiempos[tipo]], 50) * 1000, 1),
+                "p99_ms": round(percentil([dt for dt, _ in tiempos[tipo]], 99) * 1000, 1),
+                "round_trips": round(statistics.mean(rt for _, rt in tiempos[tipo]), 2) if tiempos[tipo] else None,
+            }
+            for tipo in MEZCLA
+        },
+    }
+
+    if args.json:
+        reporte["errores_harness"] = caidas
+        print(json.dumps(reporte, indent=2, ensure_ascii=False))
+        return
+
+    print(f"Sesiones: {reporte['sesiones']} • acciones: {total} • {reporte['duracion_s']} s")
+    print(f"Throughput: {reporte['throughput_acciones_s']} acciones/s")
+    print(f"Round trips por acción: {reporte['round_trips_por_accion']}")
+    print(f"Updates perdidos: {perdidas} de {confirmadas} mutaciones confirmadas")
+    print(f"Mutaciones no confirmadas (rechazadas o sin escribir): {no_confirmadas}")
+    print(f"Errores de la app: {reporte['errores_app']}")
+    print(f"Sesiones caídas (harness): {reporte['sesiones_caidas']}")
+    print()
+    print(f"{'acción':<20}{'n':>6}{'omit':>6}{'p50 ms':>10}{'p99 ms':>10}{'RT':>8}")
+    for tipo, r in reporte["por_accion"].items():
+        rt = "-" if r["round_trips"] is None else str(r["round_trips"])
+        print(f"{tipo:<20}{r['n']:>6}{r['omitidas']:>6}{r['p50_ms']:>10}{r['p99_ms']:>10}{rt:>8}")
+    for error in caidas:
+        print()
+        print(error.rstrip())
+
+
+if __name__ == "__main__":
+    main()